@@ -6,10 +6,11 @@
 ### Library imports for the model ###
 #####################################
 
-from copy import deepcopy
-from random import choice, sample, random, seed
 from itertools import combinations
+import os
+from multiprocessing import get_context
 import matplotlib.pyplot as plt
+import numpy as np
 
 
 ###############################
@@ -32,6 +33,9 @@ TOGGLE_OUR_DESIGN = True
 #################################################
 
 RANDOM_SEED = 0
+# Independent runs of the model to average over, which are spread across all
+# the cores of the machine
+NUM_REPLICATES = 1
 
 REPORT_PROGRESS = True
 REPORT_PERCENTAGE = 5
@@ -39,11 +43,23 @@ PRINT_DATA = True
 ANIMATE_GRAPH = True
 GRAPH_TYPE = "stackplot"  # line, stackplot (default)
 OUTPUT_PADDING = len(str(POPULATION_SIZE))
-
-# Only import the niche drawnow library if it is needed, to allow use even if
-# someone cannot install it, just with fewer features
-if ANIMATE_GRAPH:
-    from drawnow import drawnow
+USE_NUMBA = True
+# Whether each spreader's receivers must be different people, as when they
+# were drawn with random.sample, rather than drawn independently; collisions
+# are rare for large populations, so this is off by default as it is slower
+DISTINCT_RECEIVERS = False
+
+# Only import the niche numba library if it is needed, to allow use even if
+# someone cannot install it, just falling back to the pure numpy timestep. The
+# same is done if numba's compilation is turned off, as the numpy timestep is
+# far faster than the kernel interpreted as plain python
+NUMBA_AVAILABLE = False
+if USE_NUMBA and os.environ.get("NUMBA_DISABLE_JIT", "0") == "0":
+    try:
+        from numba import njit, prange, set_num_threads
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
 
 REPORT_MOD_NUM = int(NUM_TIMESTEPS / (100/REPORT_PERCENTAGE))
 RESISTANCE_NAMES = [str(i+1) for i in range(NUM_RESISTANCE_TYPES)]
@@ -52,142 +68,332 @@ for i in reversed(range(len(RESISTANCE_NAMES))):
     RESISTANCE_COMBINATIONS.extend([",".join(map(str,j))
                             for j in combinations(RESISTANCE_NAMES, i+1)])
 RESISTANCE_COMBINATIONS.append("#")
-
-OUR_DETECTOR, OTHER_RESISTANCES = RESISTANCE_NAMES[0], RESISTANCE_NAMES[1:]
+# The bitmask of resistances (bit i set for RESISTANCE_NAMES[i]) making up
+# each combination, so counts indexed by bitmask can be put in the same order
+RESISTANCE_COMBINATION_CODES = np.array([
+    sum(1 << RESISTANCE_NAMES.index(name) for name in combination.split(","))
+    if combination != "#" else 0
+    for combination in RESISTANCE_COMBINATIONS
+])
+# The inverse, giving the canonical name of each bitmask so it can be looked
+# up rather than rebuilt by joining strings every time it is needed
+RESISTANCE_BITMASK_NAMES = [None] * len(RESISTANCE_COMBINATIONS)
+for name, code in zip(RESISTANCE_COMBINATIONS, RESISTANCE_COMBINATION_CODES):
+    RESISTANCE_BITMASK_NAMES[code] = name
+
+# Antibiotics and resistances are referred to by their index into
+# RESISTANCE_NAMES, which is also their bit in each person's resistances
+OUR_DETECTOR = 0
+
+# Each person's resistances are packed into the bits of the smallest unsigned
+# integer type with enough of them, which is a single byte for up to 8
+if NUM_RESISTANCE_TYPES > 64:
+    raise ValueError("At most 64 resistance types can be packed per person")
+RESISTANCE_DTYPE = np.min_scalar_type((1 << NUM_RESISTANCE_TYPES) - 1)
+ANTIBIOTIC_BITS = (1 << np.arange(NUM_RESISTANCE_TYPES)).astype(RESISTANCE_DTYPE)
+# Lookup table of the bit of the antibiotic each infected person is treated
+# with, indexed by whether our detection method identifies their infection
+# and then by their random antibiotic draw
+if TOGGLE_OUR_DESIGN:
+    # Apply our detection method (identifying a) to improve success at
+    # treatment stage, by treating those it detects with one of the other
+    # antibiotics at random, and the rest with the first
+    TREATMENT_BITS = np.stack([
+        np.full(NUM_RESISTANCE_TYPES, ANTIBIOTIC_BITS[OUR_DETECTOR]),
+        ANTIBIOTIC_BITS
+    ])
+else:
+    # Randomly choose what to treat with
+    TREATMENT_BITS = np.stack([ANTIBIOTIC_BITS, ANTIBIOTIC_BITS])
+
+# Columns of the block of random draws made for each person every timestep,
+# with one draw per resistance for mutation after the fixed ones
+DRAW_RECOVERY, DRAW_MUTATION, DRAW_SPREAD, DRAW_RESISTANCES = 0, 1, 2, 3
+NUM_DRAWS = DRAW_RESISTANCES + NUM_RESISTANCE_TYPES
+
+
+def _generate_draw_mutations():
+    """Generate a function packing each person's mutation draws into a
+    bitmask of the resistances they gain, with the loop over resistances
+    unrolled since the number of them is fixed for the run"""
+    lines = [
+        "def draw_mutations(draws, probability):",
+        "    mutations = (draws[:, {}] < probability).astype(RESISTANCE_DTYPE)"
+        .format(DRAW_RESISTANCES)
+    ]
+    for i in range(1, NUM_RESISTANCE_TYPES):
+        lines.append(
+            "    mutations |= (draws[:, {}] < probability).astype(RESISTANCE_DTYPE)"
+            " << {}".format(DRAW_RESISTANCES + i, i))
+    lines.append("    return mutations")
+    namespace = {"RESISTANCE_DTYPE": RESISTANCE_DTYPE}
+    exec(compile("\n".join(lines), "<draw_mutations>", "exec"), namespace)
+    return namespace["draw_mutations"]
+
+draw_mutations = _generate_draw_mutations()
 
 
 #######################################
 ### Objects and logic for the model ###
 #######################################
 
-class Person:
-    def __init__(self):
-        """Everybody starts uninfected with no resistant strains in the model"""
-        self.infected = False
-        self.resistances = {resistance: False for resistance in RESISTANCE_NAMES}
-
-    def mutate_infections(self):
-        """Make a person resistant to each antibiotic with a set probability"""
-        for resistance in RESISTANCE_NAMES:
-            if decision(PROBABILITY_MUTATION):
-                self.infected = True
-                self.resistances[resistance] = True
-
-    def recover_from_infection(self):
-        """Recover the person, returning them to their default state; totally
-        uninfected with no resistances"""
-        self.__init__()
-
-    def treat_infection(self, antibiotic_name):
-        """Treat the infection with an antibiotic - if the infection is
-        resistant to it, do nothing, otherwise, kill the infection and all
-        other resistances it included"""
-        if self.resistances[antibiotic_name] == False:
-            self.recover_from_infection()
-
-    def spread_infection(self, other):
-        """Give any present resistant strains from the current object to the
-        other object"""
-        for resistance, present in self.resistances.items():
-            if present:
-                other.resistances[resistance] = True
-
-    def get_resistances_name(self):
-        """Get a canonical name for the present resistances"""
-        string = ",".join([k for k, v in self.resistances.items() if v])
-        if string == "":
-            return "#"
-        return string
-
-    def __repr__(self):
-        """Return a string representation of the class"""
-        if self.infected:
-            return "Infected with {}".format(self.get_resistances_name())
-        return "Not infected"
+if NUMBA_AVAILABLE:
+    # Give the types up front, so the kernel is compiled once at import and
+    # then loaded from the on-disk cache by later runs, rather than compiled
+    # again in each process on its first call
+    @njit(
+        "void({0}[:], boolean[:], {0}[:], boolean[:], float64[:, :],"
+        " int64[:], int64[:, :], float64, float64, float64, {0}[:, :])"
+        .format(RESISTANCE_DTYPE.name),
+        cache=True, parallel=True, fastmath=True
+    )
+    def _step_kernel(resistances, infected, next_resistances, next_infected,
+                     draws, antibiotic_draws, receivers,
+                     probability_general_recovery, probability_mutation,
+                     probability_spread, treatment_bits):
+        """Apply recovery, mutation, treatment and spread for one timestep in
+        a single pass over the population. The random draws are made by the
+        caller, so the kernel itself is deterministic"""
+        num_people = resistances.shape[0]
+        for i in prange(num_people):
+            # Allow for recovery from their infection
+            if draws[i, DRAW_RECOVERY] < probability_general_recovery:
+                resistances[i] = 0
+                infected[i] = False
+
+            # Allow for mutation to a resistant strain
+            if draws[i, DRAW_MUTATION] < probability_mutation:
+                for j in range(NUM_RESISTANCE_TYPES):
+                    if draws[i, DRAW_RESISTANCES + j] < probability_mutation:
+                        resistances[i] |= 1 << j
+                        infected[i] = True
+
+            # Treat with a random antibiotic, looked up by whether our
+            # detection method identifies the infection
+            if infected[i]:
+                detected = (resistances[i] >> OUR_DETECTOR) & 1
+                antibiotic_bit = treatment_bits[detected, antibiotic_draws[i]]
+                if resistances[i] & antibiotic_bit == 0:
+                    resistances[i] = 0
+                    infected[i] = False
+
+            next_resistances[i] = resistances[i]
+
+        # Spreading scatters into shared entries, so must be done serially
+        for i in range(num_people):
+            if infected[i] and draws[i, DRAW_SPREAD] < probability_spread:
+                for k in range(receivers.shape[1]):
+                    next_resistances[receivers[i, k]] |= resistances[i]
+
+        for i in prange(num_people):
+            next_infected[i] = next_resistances[i] != 0
 
 
 class Model:
-    def __init__(self, population=None):
+    def __init__(self, resistances=None, random_seed=RANDOM_SEED):
         """Start the model with a population of uninfected people, or a custom
-        population provided as a parameter"""
-        if population is None:
-            self.population = [Person() for _ in range(POPULATION_SIZE)]
+        population provided as a parameter. The population is stored as a
+        structure of arrays, with a bitmask of resistances per person"""
+        if resistances is None:
+            self.resistances = np.zeros(POPULATION_SIZE, dtype=RESISTANCE_DTYPE)
         else:
-            self.population = population
+            # The timestep works on the bitmasks in place, so they must be
+            # exactly the type it is written for
+            if resistances.ndim != 1:
+                raise ValueError("The population must be a 1-D array of resistances")
+            if resistances.dtype != RESISTANCE_DTYPE:
+                raise TypeError("The resistances must be of type {}".format(
+                    RESISTANCE_DTYPE.name))
+            self.resistances = resistances
+        self.infected = self.resistances != 0
+        # Scratch buffer for the spread step, swapped with the resistances
+        # at the end of each timestep to avoid reallocating it
+        self._next_resistances = self.resistances.copy()
+        self._next_infected = self.infected.copy()
+
+        # All randomness in the model comes from this generator, so a run is
+        # reproducible from its seed. PCG64 is named explicitly so the stream
+        # does not change if numpy's default bit generator ever does
+        self.rng = np.random.Generator(np.random.PCG64(random_seed))
 
         # Abstract away all the data handling into another class to avoid
         # cluttering up the model logic
         self.data_handler = DataHandler()
 
-        self.ys_data = [[0] * NUM_TIMESTEPS for _ in range(2 ** NUM_RESISTANCE_TYPES)]
+    def mutate_infections(self, mutations):
+        """Make each person resistant to each antibiotic set in their bitmask
+        of mutations"""
+        self.resistances |= mutations
+        self.infected |= mutations != 0
+
+    def recover_from_infections(self, recovering):
+        """Recover each person selected by the mask, returning them to their
+        default state; totally uninfected with no resistances"""
+        self.resistances[recovering] = 0
+        self.infected[recovering] = False
+
+    def treat_infections(self, antibiotic_draws):
+        """Treat every infected person with an antibiotic - if an infection is
+        resistant to it, do nothing, otherwise, kill the infection and all
+        other resistances it included"""
+        detected = (self.resistances >> OUR_DETECTOR) & 1
+        antibiotic_bits = TREATMENT_BITS[detected, antibiotic_draws]
+        resistant = self.resistances & antibiotic_bits != 0
+        self.recover_from_infections(self.infected & ~resistant)
+
+    def spread_infections(self, spreading):
+        """Give any present resistant strains from each infected person
+        selected by the mask to a number of random receivers, writing into the
+        scratch buffers"""
+        np.copyto(self._next_resistances, self.resistances)
+        spreaders = np.nonzero(self.infected & spreading)[0]
+        receivers = self.draw_receivers(spreaders.size)
+        # Each spreader passes on all its resistances to each of its
+        # receivers, so repeat them to line up with the receivers
+        sources = np.repeat(self.resistances[spreaders], NUM_SPREAD_TO)
+        np.bitwise_or.at(self._next_resistances, receivers.ravel(), sources)
+        np.not_equal(self._next_resistances, 0, out=self._next_infected)
+
+    def draw_receivers(self, num_spreaders):
+        """Draw the people each spreader passes their infection on to, as one
+        row of NUM_SPREAD_TO receivers per spreader"""
+        population_size = self.resistances.shape[0]
+        if not DISTINCT_RECEIVERS:
+            return self.rng.integers(
+                0, population_size, size=(num_spreaders, NUM_SPREAD_TO))
+
+        # Floyd's sampling algorithm, run over every spreader at once: the
+        # j-th receiver is drawn from the first N-K+j+1 people, and is swapped
+        # for person N-K+j if it is already one of the row's receivers
+        receivers = np.empty((num_spreaders, NUM_SPREAD_TO), dtype=np.int64)
+        for j in range(NUM_SPREAD_TO):
+            top = population_size - NUM_SPREAD_TO + j
+            draws = self.rng.integers(0, top + 1, size=num_spreaders)
+            clashes = (receivers[:, :j] == draws[:, None]).any(axis=1)
+            receivers[:, j] = np.where(clashes, top, draws)
+        return receivers
+
+    def draw_timestep(self):
+        """Make all the random draws needed by the population in a timestep:
+        the floats for each stochastic event in one block, and the
+        antibiotics to treat with"""
+        population_size = self.resistances.shape[0]
+        draws = self.rng.random((population_size, NUM_DRAWS))
+        if TOGGLE_OUR_DESIGN:
+            # Only the antibiotics other than our detector are chosen between
+            antibiotic_draws = self.rng.integers(
+                1, NUM_RESISTANCE_TYPES, population_size)
+        else:
+            antibiotic_draws = self.rng.integers(
+                0, NUM_RESISTANCE_TYPES, population_size)
+        return draws, antibiotic_draws
+
+    def step_kernel(self):
+        """Advance the model by a timestep with the fused numba kernel,
+        writing into the scratch buffers"""
+        # Receivers are drawn for everyone, as the kernel decides who spreads,
+        # with the same number of rows as the draws it loops over
+        draws, antibiotic_draws = self.draw_timestep()
+        receivers = self.draw_receivers(self.resistances.shape[0])
+        _step_kernel(
+            self.resistances, self.infected,
+            self._next_resistances, self._next_infected,
+            draws, antibiotic_draws, receivers,
+            float(PROBABILITY_GENERAL_RECOVERY), float(PROBABILITY_MUTATION),
+            float(PROBABILITY_SPREAD), TREATMENT_BITS
+        )
+
+    def step(self):
+        """Advance the model by a timestep with numpy array operations,
+        writing into the scratch buffers"""
+        draws, antibiotic_draws = self.draw_timestep()
+
+        # Allow for recovery from their infection
+        self.recover_from_infections(
+            draws[:, DRAW_RECOVERY] < PROBABILITY_GENERAL_RECOVERY)
+
+        # Allow for mutation to a resistant strain
+        mutations = draw_mutations(draws, PROBABILITY_MUTATION)
+        mutations[draws[:, DRAW_MUTATION] >= PROBABILITY_MUTATION] = 0
+        self.mutate_infections(mutations)
+
+        # Treat with a random antibiotic (which are indexed the same
+        # as the strains which are resistant to them)
+        self.treat_infections(antibiotic_draws)
+
+        # Spread the infection strains throughout the population
+        self.spread_infections(draws[:, DRAW_SPREAD] < PROBABILITY_SPREAD)
 
     def run(self):
-        """Simulate a number of timesteps within the model"""
+        """Simulate a number of timesteps within the model, returning the
+        data recorded about them"""
+        # Look up the methods used every timestep once, outside the loop
+        step = self.step_kernel if NUMBA_AVAILABLE else self.step
+        process_timestep_data = self.data_handler.process_timestep_data
+        get_infection_statistics = self.get_infection_statistics
+
         for i in range(NUM_TIMESTEPS):
 
             # Record data about the proportions of strains prevalence within
             # the population
-            self.data_handler.process_timestep_data(
-                self.get_infection_statistics().values()
-            )
-
-            # For each person in the population
-            for person in self.population:
-                # Allow for recovery from their infection
-                if decision(PROBABILITY_GENERAL_RECOVERY):
-                    person.recover_from_infection()
-
-                # Allow for mutation to a resistant strain
-                if decision(PROBABILITY_MUTATION):
-                    person.mutate_infections()
-
-                # Treat with a random antibiotic (which are named the same
-                # as the strains which are resistant to them)
-                if person.infected:
-                    if TOGGLE_OUR_DESIGN:
-                        # Apply our detection method (identifying a) to improve
-                        # success at treatment stage
-                        if person.resistances[OUR_DETECTOR]:
-                            antibiotic = choice(OTHER_RESISTANCES)
-                        else:
-                            antibiotic = OUR_DETECTOR
-                    else:
-                        # Randomly choose what to treat with
-                        antibiotic = choice(RESISTANCE_NAMES)
-
-                    person.treat_infection(antibiotic)
-
-            # Spread the infection strains throughout the population
-            # We need a deepcopy operation, to prevent someone who has just
+            process_timestep_data(get_infection_statistics())
+
+            step()
+
+            # We write into a second buffer, to prevent someone who has just
             # been spread to in this timestep spreading the thing they've
             # just received, so technically don't have yet
-            updated_population = deepcopy(self.population)
-            for person in self.population:
-                if person.infected and decision(PROBABILITY_SPREAD):
-                    for receiver in sample(updated_population, NUM_SPREAD_TO):
-                        person.spread_infection(receiver)
-            self.population = updated_population[:]
+            self.resistances, self._next_resistances = (
+                self._next_resistances, self.resistances)
+            self.infected, self._next_infected = (
+                self._next_infected, self.infected)
 
+        return self.data_handler.ys_data
 
     def get_infection_statistics(self):
-        """Get the percentage infected with each type of bacteria"""
-        infections = {name:0 for name in RESISTANCE_COMBINATIONS}
-        for person in self.population:
-            infections[person.get_resistances_name()] += 1
-        return infections
+        """Get the number of people infected with each combination of
+        resistances, in the order of RESISTANCE_COMBINATIONS"""
+        counts = np.bincount(
+            self.resistances, minlength=1 << NUM_RESISTANCE_TYPES)
+        return counts[RESISTANCE_COMBINATION_CODES]
+
+    def get_resistances_name(self, person):
+        """Get a canonical name for the resistances present in a person"""
+        return RESISTANCE_BITMASK_NAMES[self.resistances[person]]
 
     def __repr__(self):
-        """Return a string encoding the percentage of people infected by
+        """Return a string encoding the number of people infected by
         each anti-biotic resistant bacteria"""
-        infection_strings = ""
-        for k,v in self.get_infection_statistics():
-            infection_strings += "{}% {}".format(v, k)
-        return ",".join(infection_strings)
+        return ", ".join("{} {}".format(v, k) for k, v in zip(
+            RESISTANCE_COMBINATIONS, self.get_infection_statistics()))
+
+
+def _init_replicate_worker():
+    """Quieten a worker process running replicates, so they don't all report
+    their progress over each other"""
+    global REPORT_PROGRESS, PRINT_DATA, ANIMATE_GRAPH
+    REPORT_PROGRESS = PRINT_DATA = ANIMATE_GRAPH = False
+    # Every core is already busy with a replicate, so don't also parallelise
+    # the timestep kernel within each one
+    if NUMBA_AVAILABLE:
+        set_num_threads(1)
+
+
+def run_replicate(random_seed):
+    """Run the model once from a given seed, returning its data"""
+    return Model(random_seed=random_seed).run()
 
 
-def decision(probability):
-    """Get a boolean value with a given probability"""
-    return random() < probability
+def run_replicates(num_replicates, random_seed=RANDOM_SEED):
+    """Run a number of independent replicates of the model in parallel,
+    returning the mean of their data"""
+    # Spawn a distinct, independent seed for each replicate
+    seeds = np.random.SeedSequence(random_seed).spawn(num_replicates)
+    # Start fresh worker processes rather than forking this one, as numba's
+    # threading layer is not safe to fork once the kernel has been compiled
+    with get_context("spawn").Pool(initializer=_init_replicate_worker) as pool:
+        results = pool.map(run_replicate, seeds)
+    return np.stack(results).mean(axis=0)
 
 
 ###############################################
@@ -199,28 +405,32 @@ class DataHandler:
         """Initialise the data handler for the model as storing data
         in an appropriate structure"""
         self.time = []
-        self.ys_data = [[] for _ in range(2 ** NUM_RESISTANCE_TYPES)]
+        # One row per resistance combination, one column per timestep
+        self.ys_data = np.zeros(
+            (2 ** NUM_RESISTANCE_TYPES, NUM_TIMESTEPS), dtype=np.int32)
 
         self.timestep = 0
 
     def draw_full_graph(self):
         """Draw a graph of all of the data in the graph"""
         DataRenderer.draw_full_graph(
-                            self.time, self.ys_data, RESISTANCE_COMBINATIONS)
+            self.time, self.ys_data[:, :self.timestep], RESISTANCE_COMBINATIONS)
 
     def _print_current_data(self):
         """Print the values of the current state of the simulation"""
-        # TODO
-        items = []
-        for i,label in enumerate(RESISTANCE_COMBINATIONS):
-            items.append("{}: {}".format(
-                RESISTANCE_COMBINATIONS[i],
-                str(round(self.ys_data[i][-1], 2)).ljust(OUTPUT_PADDING)
-            ))
-        print(", ".join(items))
+        # Formatting every combination is only worth it if it is printed
+        if not PRINT_DATA:
+            return
+        current_data = self.ys_data[:, self.timestep - 1]
+        print(", ".join(
+            "{}: {}".format(label, str(count).ljust(OUTPUT_PADDING))
+            for label, count in zip(RESISTANCE_COMBINATIONS, current_data)
+        ))
 
     def _report_model_state(self):
         """Report the model's state through any mechanism set in parameters"""
+        if not (REPORT_PROGRESS or PRINT_DATA or ANIMATE_GRAPH):
+            return
         if self.timestep % REPORT_MOD_NUM == 0:
             if REPORT_PROGRESS and not PRINT_DATA:
                 print("{}% complete".format(int(
@@ -235,15 +445,18 @@ class DataHandler:
                     )).ljust(2)), end=" - ")
                 self._print_current_data()
 
-        if ANIMATE_GRAPH:
-            DataRenderer.animate_current_graph(
-                            self.time, self.ys_data, RESISTANCE_COMBINATIONS)
+            # Redrawing the graph is expensive, so only do it as often as
+            # the progress is reported
+            if ANIMATE_GRAPH:
+                DataRenderer.animate_current_graph(
+                    self.time, self.ys_data[:, :self.timestep],
+                    RESISTANCE_COMBINATIONS
+                )
 
-    def process_timestep_data(self, infection_percentages):
+    def process_timestep_data(self, infection_counts):
         """Store the current timestep's data into the appropriate data
         structures"""
-        for j,data_point in enumerate(infection_percentages):
-            self.ys_data[j].append(data_point)
+        self.ys_data[:, self.timestep] = infection_counts
         self.time.append(self.timestep)
 
         self.timestep += 1
@@ -252,6 +465,11 @@ class DataHandler:
 
 
 class DataRenderer:
+    # Artists and the background they are drawn onto, kept between animation
+    # frames so only the data needs to be redrawn rather than the whole figure
+    _animated_artists = None
+    _background = None
+
     @staticmethod
     def _draw_graph(time, ys_data, labels):
         """Actually draw the graph via matplotlib"""
@@ -278,27 +496,97 @@ class DataRenderer:
         DataRenderer._graph_settings()
         plt.show()
 
+    @staticmethod
+    def _stack_verts(time, ys_data):
+        """Get the outline of each layer of a stackplot of the data, going
+        along its bottom edge and back along its top edge"""
+        time = np.asarray(time)
+        tops = np.cumsum(ys_data, axis=0)
+        bottoms = np.vstack([np.zeros_like(tops[:1]), tops[:-1]])
+        return [
+            np.concatenate([
+                np.column_stack([time, bottom]),
+                np.column_stack([time[::-1], top[::-1]])
+            ])
+            for bottom, top in zip(bottoms, tops)
+        ]
+
+    @staticmethod
+    def _start_animation(labels):
+        """Make the artists to animate, then draw everything else about the
+        graph once as the background to draw them onto"""
+        figure, axes = plt.gcf(), plt.gca()
+        if GRAPH_TYPE == "line":
+            artists = [axes.plot([], [], label=label)[0] for label in labels]
+        else:
+            artists = axes.stackplot(
+                [0], np.zeros((len(labels), 1)), labels=labels)
+        for artist in artists:
+            artist.set_animated(True)
+
+        # The axes can't rescale to the data as it is only drawn onto the
+        # background, so fix them to their largest possible extents
+        axes.set_xlim(0, NUM_TIMESTEPS - 1)
+        axes.set_ylim(0, POPULATION_SIZE)
+        DataRenderer._graph_settings()
+
+        figure.canvas.draw()
+        DataRenderer._background = figure.canvas.copy_from_bbox(axes.bbox)
+        DataRenderer._animated_artists = artists
+
     @staticmethod
     def animate_current_graph(time, ys_data, labels):
         """Draw a graph up to the current state of the simulation"""
-        drawnow(lambda: DataRenderer._draw_graph(time, ys_data, labels))
+        if DataRenderer._animated_artists is None:
+            DataRenderer._start_animation(labels)
+        figure, axes = plt.gcf(), plt.gca()
+        artists = DataRenderer._animated_artists
 
+        # Only update the data the artists show, rather than remaking them
+        if GRAPH_TYPE == "line":
+            for line, ys in zip(artists, ys_data):
+                line.set_data(time, ys)
+        else:
+            for layer, verts in zip(
+                    artists, DataRenderer._stack_verts(time, ys_data)):
+                layer.set_verts([verts])
 
-if __name__ == "__main__":
-    # Seed the random number generator
-    if RANDOM_SEED is not None:
-        seed(RANDOM_SEED)
+        # Redraw just the artists over the background
+        figure.canvas.restore_region(DataRenderer._background)
+        for artist in artists:
+            axes.draw_artist(artist)
+        figure.canvas.blit(axes.bbox)
+        figure.canvas.flush_events()
+
+    @staticmethod
+    def finish_animation():
+        """Make the animated artists part of the figure again, so they stay
+        shown when it is next fully redrawn"""
+        if DataRenderer._animated_artists is not None:
+            for artist in DataRenderer._animated_artists:
+                artist.set_animated(False)
+            plt.gcf().canvas.draw_idle()
 
+
+if __name__ == "__main__":
     # Enable interactivity in matplotlib figures
     plt.ion()
 
-    # Create and run the model
-    m = Model()
-    m.run()
+    if NUM_REPLICATES > 1:
+        # Run many models, and show the graph of their average
+        ys_data = run_replicates(NUM_REPLICATES)
+        DataRenderer.draw_full_graph(
+            list(range(NUM_TIMESTEPS)), ys_data, RESISTANCE_COMBINATIONS)
+    else:
+        # Create and run the model
+        m = Model()
+        m.run()
 
-    if not ANIMATE_GRAPH:
-        # Finally show the full simulation graph
-        m.data_handler.draw_full_graph()
+        if ANIMATE_GRAPH:
+            DataRenderer.finish_animation()
+        else:
+            # Finally show the full simulation graph
+            m.data_handler.draw_full_graph()
 
     # Don't immediately close when the simulation is done
     input("Press any key to exit: ")
@@ -18,9 +18,14 @@ setup(
     keywords = ['iGEM', 'synthetic biology', 'model'],
     install_requires = [
         'matplotlib',
+        'numpy',
         'pandas',
         'seaborn'
     ],
+    extras_require = {
+        'numba': ['numba'],
+        'torch': ['torch'],
+    },
     classifiers = [
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Science/Research',
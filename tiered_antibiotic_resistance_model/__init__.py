@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from .model import Params, Settings, Infection, Treatment, Person, Model, DataHandler, DataRenderer, decision, run, run_and_output
-from .model_minimal import Params, Settings, Infection, Treatment, Person, Model, DataHandler, decision, run
+from .model import Params, Settings, Infection, Treatment, Person, ModelState, Model, DataHandler, DataRenderer, decision, run, run_batch, run_and_output
+from .model_minimal import Params, Settings, Infection, Treatment, Person, ModelState, Model, DataHandler, decision, run, run_batch
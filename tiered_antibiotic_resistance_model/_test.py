@@ -2,7 +2,12 @@
 # -*- coding: utf-8 -*-
 
 import unittest, math
-from .model_minimal import Params, Settings, Infection, Treatment, Person, Model, DataHandler, decision, run
+import numpy as np
+from importlib.util import find_spec
+from .model_minimal import Params, Settings, Infection, Treatment, Person, Model, DataHandler, decision, run, run_batch, NUMBA_AVAILABLE
+
+# PyTorch is slow to import, so only check whether it is installed here
+TORCH_AVAILABLE = find_spec("torch") is not None
 
 # Convert unit tests to property based tests by iterating them, so the random
 # input state will test across the input domain
@@ -67,7 +72,27 @@ def set_no_deaths_recoveries():
     Params.NUM_TIMESTEPS = 3 * Params.TIMESTEPS_MOVE_UP_LAG_TIME
 
 
+def set_batch_params():
+    Params.POPULATION_SIZE = 500
+    Params.INITIALLY_INFECTED = 10
+    Params.PROBABILITY_SPREAD = 0.5
+    Params.NUM_SPREAD_TO = 2
+    Params.PROBABILITY_GENERAL_RECOVERY = 0
+    Params.PROBABILITY_TREATMENT_RECOVERY = 0.1
+    Params.PROBABILITY_DEATH = 0.01
+    Params.reset_granular_parameters()
+
+
 class TestModel(unittest.TestCase):
+    def assertStatesDisjoint(self, data_handler):
+        """Check over all timesteps that the states sum to the population"""
+        for i in range(Params.NUM_TIMESTEPS):
+            infected = sum([x[i] for x in data_handler.get_infected_data()])
+            dead = data_handler.get_death_data()[i]
+            immune = data_handler.get_immune_data()[i]
+            uninfected = data_handler.get_uninfected_data()[i]
+            self.assertEqual(sum([infected, dead, immune, uninfected]), Params.POPULATION_SIZE)
+
     def test_empty_model(self):
         """Test that a model with no infected people always stays fully uninfected"""
         # Change parameters for the test setup and run the test
@@ -93,6 +118,26 @@ class TestModel(unittest.TestCase):
         reset_params()
 
 
+    def test_immune_infected_certain_death(self):
+        """People who are immune but still infected are no longer immune once
+        they die, so are counted as dead"""
+        # Someone not immune is needed too, as the immune are not counted as
+        # infected, so otherwise the run would end straight away
+        Params.PROBABILITY_DEATH = 1
+        Params.DEATH_FUNCTION = lambda p, t: p
+        Params.PROBABILITY_GENERAL_RECOVERY = 0
+        Params.PROBABILITY_TREATMENT_RECOVERY = 0
+        Params.reset_granular_parameters()
+        for _ in range(PROPERTY_BASED_TESTING_REPEATS):
+            m = Model([Person(infection=Infection())]
+                      + [Person(infection=Infection(), immune=True)
+                         for _ in range(Params.POPULATION_SIZE - 1)])
+            m.run()
+            self.assertEqual(m.data_handler.get_death_data()[-1], Params.POPULATION_SIZE)
+            self.assertEqual(m.data_handler.get_immune_data()[-1], 0)
+        reset_params()
+
+
     def test_all_infected_certain_recovery(self):
         """100% infected, 0% death chance, 100% recovery -> 100% immune"""
         Params.INITIALLY_INFECTED = Params.POPULATION_SIZE
@@ -104,6 +149,51 @@ class TestModel(unittest.TestCase):
         for _ in range(PROPERTY_BASED_TESTING_REPEATS):
             m = run()
             self.assertEqual(m.data_handler.get_immune_data()[-1], Params.POPULATION_SIZE)
+            # Nothing changes once everyone has recovered, so every remaining
+            # timestep holds the same data
+            self.assertEqual(m.data_handler.get_immune_data(),
+                            [0] + [Params.POPULATION_SIZE]*(Params.NUM_TIMESTEPS-1))
+            self.assertEqual(m.data_handler.time.tolist(), list(range(Params.NUM_TIMESTEPS)))
+            self.assertEqual(m.data_handler.timestep, Params.NUM_TIMESTEPS)
+        reset_params()
+
+    def test_scalar_death_function(self):
+        """A death function which only takes a single time at once still
+        gives the probability of death at each time"""
+        params = (Params.INITIALLY_INFECTED, Params.PROBABILITY_DEATH,
+                  Params.DEATH_FUNCTION, Params.PROBABILITY_GENERAL_RECOVERY,
+                  Params.PROBABILITY_TREATMENT_RECOVERY, Params.PROBABILITY_MUTATION)
+        Params.INITIALLY_INFECTED = Params.POPULATION_SIZE
+        Params.PROBABILITY_DEATH = 0
+        Params.DEATH_FUNCTION = lambda p, t: 1 if t > 3 else p
+        Params.PROBABILITY_GENERAL_RECOVERY = 0
+        Params.PROBABILITY_TREATMENT_RECOVERY = 0
+        Params.PROBABILITY_MUTATION = 0
+        Params.reset_granular_parameters()
+        for _ in range(PROPERTY_BASED_TESTING_REPEATS):
+            m = run()
+            self.assertEqual(m.data_handler.get_death_data()[:5], [0]*5)
+            self.assertEqual(m.data_handler.get_death_data()[5], Params.POPULATION_SIZE)
+        (Params.INITIALLY_INFECTED, Params.PROBABILITY_DEATH,
+         Params.DEATH_FUNCTION, Params.PROBABILITY_GENERAL_RECOVERY,
+         Params.PROBABILITY_TREATMENT_RECOVERY, Params.PROBABILITY_MUTATION) = params
+        reset_params()
+
+    def test_scalar_death_function_table(self):
+        """The probabilities of death from a death function which only takes a
+        single time at once are those from calling it at each time"""
+        death_function = Params.DEATH_FUNCTION
+        Params.DEATH_FUNCTION = lambda p, t: round(min(0.001*t + p, 1), 4)
+        Params.reset_granular_parameters()
+        m = Model()
+        max_time_infected = m.death_probabilities.shape[1] - 1
+        expected = np.array([
+            [function(probability, t) for t in range(max_time_infected + 1)]
+            for function, probability in zip(
+                Params.TIER_DEATH_FUNCTION, Params.TIER_PROBABILITY_DEATH)
+        ], dtype=np.float32)
+        self.assertEqual(m.death_probabilities.tolist(), expected.tolist())
+        Params.DEATH_FUNCTION = death_function
         reset_params()
 
     def test_total_spread(self):
@@ -242,16 +332,75 @@ class TestModel(unittest.TestCase):
             self.assertEqual(m.data_handler.get_isolated_data()[-1], Params.POPULATION_SIZE)
         reset_params()
 
+    def test_population_state(self):
+        """A population given as people is stored in, and read back from, the
+        model state unchanged"""
+        population = [
+            Person(),
+            Person(infection=Infection()),
+            Person(infection=Infection(Params.DRUG_NAMES[1]),
+                   treatment=Treatment(Params.DRUG_NAMES[2], 3), isolated=True,
+                   time_infected=4),
+            Person(immune=True),
+            Person(alive=False),
+        ]
+        m = Model(population)
+        self.assertEqual(repr(m.population), repr(population))
+        self.assertEqual(m.population[2].time_infected, 4)
+
+    def test_batch_replicates(self):
+        """Each replicate in a batch has its own disjoint states, starting from
+        the same population but diverging from each other"""
+        set_batch_params()
+        batch_size = 4
+        m = run_batch(batch_size)
+        self.assertEqual(len(m.data_handlers), batch_size)
+        for data_handler in m.data_handlers:
+            self.assertEqual(data_handler.get_uninfected_data()[0],
+                             Params.POPULATION_SIZE - Params.INITIALLY_INFECTED)
+            self.assertStatesDisjoint(data_handler)
+        self.assertNotEqual(m.data_handlers[0].ys_data.tolist(),
+                            m.data_handlers[1].ys_data.tolist())
+        reset_params()
+
+    @unittest.skipUnless(NUMBA_AVAILABLE, "numba is not installed")
+    def test_numba_matches_numpy(self):
+        """The compiled kernel and the NumPy fallback use the same random
+        draws in the same way, so give the same results for a seed"""
+        set_batch_params()
+        use_numba = Settings.USE_NUMBA
+        for random_seed in range(PROPERTY_BASED_TESTING_REPEATS):
+            ys_datas = []
+            for numba in [True, False]:
+                Settings.USE_NUMBA = numba
+                m = Model(random_seed=random_seed, batch_size=2)
+                m.run()
+                ys_datas.append([data_handler.ys_data.tolist() for data_handler in m.data_handlers])
+            self.assertEqual(ys_datas[0], ys_datas[1])
+        Settings.USE_NUMBA = use_numba
+        reset_params()
+
+    @unittest.skipUnless(TORCH_AVAILABLE, "PyTorch is not installed")
+    def test_torch_batch_replicates(self):
+        """The PyTorch backend keeps the states of each replicate disjoint"""
+        set_batch_params()
+        use_torch, torch_device = Settings.USE_TORCH, Settings.TORCH_DEVICE
+        Settings.USE_TORCH, Settings.TORCH_DEVICE = True, "cpu"
+        batch_size = 4
+        m = run_batch(batch_size)
+        self.assertTrue(m.use_torch)
+        for data_handler in m.data_handlers:
+            self.assertEqual(data_handler.get_uninfected_data()[0],
+                             Params.POPULATION_SIZE - Params.INITIALLY_INFECTED)
+            self.assertStatesDisjoint(data_handler)
+        Settings.USE_TORCH, Settings.TORCH_DEVICE = use_torch, torch_device
+        reset_params()
+
     def test_disjoint_states(self):
         """Check over all timesteps that the states are disjoint"""
         for _ in range(PROPERTY_BASED_TESTING_REPEATS):
             m = run()
-            for i in range(Params.NUM_TIMESTEPS):
-                infected = sum([x[i] for x in m.data_handler.get_infected_data()])
-                dead = m.data_handler.get_death_data()[i]
-                immune = m.data_handler.get_immune_data()[i]
-                uninfected = m.data_handler.get_uninfected_data()[i]
-                self.assertEqual(sum([infected, dead, immune, uninfected]),Params.POPULATION_SIZE)
+            self.assertStatesDisjoint(m.data_handler)
         reset_params()
 
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from random import seed, random, sample
+import numpy as np
 import matplotlib.pyplot as plt
 import pandas as pd
 
@@ -13,6 +13,29 @@ plt.rcParams['figure.figsize'] = [16, 9]
 plt.rcParams['figure.dpi'] = 200
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
+# Only use numba if it is installed, as the model can run without it, just
+# more slowly
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# PyTorch is only needed to run the model on a GPU, and is slow to import, so
+# it is only imported once a model is set to use it
+torch = None
+
+
+def _import_torch():
+    """Import PyTorch if it is installed, returning whether it is"""
+    global torch
+    if torch is None:
+        try:
+            import torch
+        except ImportError:
+            return False
+    return True
+
 
 ###############################
 ### Change these parameters ###
@@ -44,8 +67,9 @@ class Params:
     PROBABILITY_TREATMENT_RECOVERY = 0.3
     PROBABILITY_MUTATION = 0.25
     PROBABILITY_DEATH = 0.015
-    # Add time infected into consideration for death chance
-    DEATH_FUNCTION = lambda p, t: round(min(0.001*t + p, 1), 4)
+    # Add time infected into consideration for death chance, for a single
+    # time or an array of them at once
+    DEATH_FUNCTION = lambda p, t: np.minimum(0.001*t + p, 1)
     PROBABILITY_SPREAD = 0.25
     NUM_SPREAD_TO = 1
 
@@ -75,6 +99,10 @@ class Params:
 
         # Lookup table of resistance properties by their names
         Params.NUM_RESISTANCES = len(Params.DRUG_NAMES)
+        # Integer tiers of the resistances and drugs by their names, with no
+        # resistance below all of them
+        Params.NAME_TO_TIER = {name: tier for tier, name in enumerate(Params.DRUG_NAMES)}
+        Params.NAME_TO_TIER["None"] = -1
         Params.RESISTANCE_PROPERTIES = {}
         Params.RESISTANCE_PROPERTIES["None"] = (
             Params.PROBABILITY_GENERAL_RECOVERY, Params.PROBABILITY_MUTATION,
@@ -97,6 +125,31 @@ class Params:
             Params.PROBABILITY_DEATH, Params.DEATH_FUNCTION,
         )
 
+        # The same properties as arrays indexed by the tier of an infection
+        # plus one (so the infection with no resistances comes first), and
+        # of a treatment, for the model to look up across the population
+        properties = [
+            Params.RESISTANCE_PROPERTIES[resistance]
+            for resistance in ["None"] + Params.DRUG_NAMES
+        ]
+        Params.TIER_PROBABILITY_GENERAL_RECOVERY = np.array(
+            [p[0] for p in properties], dtype=np.float32)
+        Params.TIER_PROBABILITY_MUTATION = np.array(
+            [p[1] for p in properties], dtype=np.float32)
+        Params.TIER_PROBABILITY_SPREAD = np.array(
+            [p[2] for p in properties], dtype=np.float32)
+        Params.TIER_NUM_SPREAD_TO = np.array([p[3] for p in properties])
+        Params.TIER_PROBABILITY_DEATH = np.array(
+            [p[4] for p in properties], dtype=np.float32)
+        Params.TIER_DEATH_FUNCTION = [p[5] for p in properties]
+        Params.TIER_PROBABILITY_TREATMENT_RECOVERY = np.array([
+            Params.DRUG_PROPERTIES[drug][0] for drug in Params.DRUG_NAMES
+        ], dtype=np.float32)
+        # Whether the treatment of each tier works on the infection of each
+        # tier plus one, which is when the infection isn't resistant to it
+        Params.TREATS = (np.arange(Params.NUM_RESISTANCES)[:, None]
+                         > np.arange(-1, Params.NUM_RESISTANCES)[None, :])
+
 
 # Set the granular parameters from the generic ones
 Params.reset_granular_parameters()
@@ -120,6 +173,12 @@ class Settings:
     PRINT_DATA = True
     OUTPUT_PADDING = len(str(Params.POPULATION_SIZE))
 
+    # Update people with a compiled kernel, if numba is installed
+    USE_NUMBA = True
+    # Run the model with PyTorch on a device such as a GPU, if it is installed
+    USE_TORCH = False
+    TORCH_DEVICE = "cuda"
+
     DRAW_GRAPH = True
     GRAPH_TYPE = "line" # line, stackplot (default)
     EXPORT_TO_EXCEL = False
@@ -131,40 +190,75 @@ class Settings:
 #######################################
 
 class Infection:
+    __slots__ = ("tier", "time_treated")
+
     def __init__(self, resistance=None, time_treated=0):
         """Initialise an infection within the model"""
         if resistance is None:
             resistance = "None"
 
-        self.resistance = resistance
-        self.general_recovery_probability = Params.RESISTANCE_PROPERTIES[resistance][0]
-        self.mutation_probability = Params.RESISTANCE_PROPERTIES[resistance][1]
-        self.spread_probability = Params.RESISTANCE_PROPERTIES[resistance][2]
-        self.num_spread_to = Params.RESISTANCE_PROPERTIES[resistance][3]
-        self.death_probability = Params.RESISTANCE_PROPERTIES[resistance][4]
-        self.death_function = Params.RESISTANCE_PROPERTIES[resistance][5]
-
+        # Only the tier of the resistance is stored, with its name looked up
+        # from it when needed
+        self.tier = Params.NAME_TO_TIER[resistance]
         self.time_treated = time_treated
 
+    @property
+    def resistance(self):
+        """The name of the resistance of the infection"""
+        if self.tier == -1:
+            return "None"
+        return Params.DRUG_NAMES[self.tier]
+
+    # The properties of the infection are looked up by its tier when needed,
+    # rather than copied onto every instance
+
+    @property
+    def general_recovery_probability(self):
+        """The probability of recovering without treatment each timestep"""
+        return Params.TIER_PROBABILITY_GENERAL_RECOVERY[self.tier + 1]
+
+    @property
+    def mutation_probability(self):
+        """The probability of mutating to resist the treatment each timestep"""
+        return Params.TIER_PROBABILITY_MUTATION[self.tier + 1]
+
+    @property
+    def spread_probability(self):
+        """The probability of spreading each timestep"""
+        return Params.TIER_PROBABILITY_SPREAD[self.tier + 1]
+
+    @property
+    def num_spread_to(self):
+        """The number of people the infection spreads to at once"""
+        return int(Params.TIER_NUM_SPREAD_TO[self.tier + 1])
+
+    @property
+    def death_probability(self):
+        """The base probability of dying from the infection each timestep"""
+        return Params.TIER_PROBABILITY_DEATH[self.tier + 1]
+
+    @property
+    def death_function(self):
+        """The function giving the probability of dying from the infection,
+        from the base probability and the time infected"""
+        return Params.TIER_DEATH_FUNCTION[self.tier + 1]
+
     def make_resistant(self, resistance):
         """Give the infection a specified resistance"""
-        self.__init__(resistance, self.time_treated)
+        self.tier = Params.NAME_TO_TIER[resistance]
 
     def is_resistant(self, resistance):
         """Return whether the infection has a specified resistance"""
-        return self.get_tier() >= Infection.get_tier_from_resistance(resistance)
+        return self.tier >= Params.NAME_TO_TIER[resistance]
 
     def get_tier(self):
         """Return how resistant the infection is - higher is more resistant"""
-        return Infection.get_tier_from_resistance(self.resistance)
+        return self.tier
 
     @staticmethod
     def get_tier_from_resistance(resistance):
         """Return an integer ordering of resistances - higher is more resistant"""
-        if resistance == "None":
-            return -1
-        else:
-            return Params.DRUG_NAMES.index(resistance)
+        return Params.NAME_TO_TIER[resistance]
 
     def duplicate(self):
         """Return a duplicate object of the current infection"""
@@ -179,27 +273,39 @@ class Infection:
 
 
 class Treatment:
+    __slots__ = ("tier", "time_treated")
+
     def __init__(self, drug=Params.DRUG_NAMES[0], time_treated=None):
         """Initialise a treatment within the model"""
-        self.drug = drug
-        self.treatment_recovery_probability = Params.DRUG_PROPERTIES[drug][0]
+        # Only the tier of the drug is stored, as with infections
+        self.tier = Params.NAME_TO_TIER[drug]
 
         if time_treated is not None:
             self.time_treated = time_treated
         else:
             self.time_treated = 0
 
+    @property
+    def drug(self):
+        """The name of the drug of the treatment"""
+        return Params.DRUG_NAMES[self.tier]
+
+    @property
+    def treatment_recovery_probability(self):
+        """The probability of the treatment curing an infection it works on
+        each timestep"""
+        return Params.TIER_PROBABILITY_TREATMENT_RECOVERY[self.tier]
+
     def next_treatment(self):
         """Move up the treatment to the next strongest drug, and reset the
         amount of time that it has been used to zero"""
-        drug_index = Params.DRUG_NAMES.index(self.drug)
-        if drug_index < Params.NUM_RESISTANCES - 1:
-            self.__init__(Params.DRUG_NAMES[drug_index + 1], self.time_treated)
+        if self.tier < Params.NUM_RESISTANCES - 1:
+            self.tier += 1
 
     def treats_infection(self, infection):
         """Return whether the treatment works on the infection given any
         resistances the infection may have"""
-        return not infection.is_resistant(self.drug)
+        return bool(Params.TREATS[self.tier, infection.tier + 1])
 
     def duplicate(self):
         """Return a duplicate object of the current treatment"""
@@ -211,6 +317,8 @@ class Treatment:
 
 
 class Person:
+    __slots__ = ("infection", "treatment", "isolated", "immune", "time_infected", "alive")
+
     def __init__(self, infection=None, treatment=None, isolated=False, immune=False, time_infected=0, alive=True):
         """Initialise a person as having various properties within the model"""
         self.infection = infection
@@ -225,13 +333,17 @@ class Person:
         """Recover the person, returning them to their default state; totally
         uninfected with no resistances, but now immune to the infection -
         irrespective of any resistances it has"""
-        self.__init__(immune=True)
+        self.infection = None
+        self.treatment = None
+        self.isolated = False
+        self.immune = True
+        self.time_infected = 0
 
     def mutate_infection(self):
         """Make the infection become resistant to the treatment with a given
         probability of occurring"""
         if self.infection is not None and self.treatment is not None:
-            self.infection.make_resistant(self.treatment.drug)
+            self.infection.tier = self.treatment.tier
 
     def increase_treatment(self):
         """Move up the treatment by one"""
@@ -250,9 +362,10 @@ class Person:
         receive it (susceptible), don't already have a more resistant infection
         (directional), and neither are isolated (contactable)"""
         if self.infection is not None and decision(self.infection.spread_probability):
-            for receiver in sample(population, self.infection.num_spread_to):
+            receivers = _rng.choice(len(population), self.infection.num_spread_to, replace=False)
+            for receiver in (population[j] for j in receivers):
                 directional = (receiver.infection is None
-                    or self.infection.get_tier() > receiver.infection.get_tier())
+                    or self.infection.tier > receiver.infection.tier)
                 susceptible = not receiver.immune and receiver.alive
                 contactable = not self.isolated and not receiver.isolated
                 if directional and susceptible and contactable:
@@ -264,7 +377,12 @@ class Person:
 
     def die(self):
         """Make the person no longer alive"""
-        self.__init__(alive=False)
+        self.infection = None
+        self.treatment = None
+        self.isolated = False
+        self.immune = False
+        self.time_infected = 0
+        self.alive = False
 
     def duplicate(self):
         """Return a duplicate object of the current person, including
@@ -292,21 +410,367 @@ class Person:
         return "Uninfected person"
 
 
+# Values of the tiers in the model state for people who are not infected or
+# not treated. No infection is below an infection with no resistances (tier
+# -1, as given by `Infection.get_tier`), so any infection can spread to them
+NO_INFECTION = -2
+NO_TREATMENT = -1
+
+# Columns of the block of random draws made for each person every timestep
+DRAW_MOVE_UP = 0
+DRAW_PRODUCT_DETECT = 1
+DRAW_GENERAL_RECOVERY = 2
+DRAW_TREATMENT_RECOVERY = 3
+DRAW_MUTATION = 4
+DRAW_DEATH = 5
+DRAW_SPREAD = 6
+NUM_DRAWS = 7
+
+
+# The kernels are cached to disk when this is imported as part of the
+# package. The cache records the module they were compiled in, so it can't be
+# loaded under another name, such as when running this file directly without
+# the package being importable, which compiles them afresh instead
+_CACHE_KERNELS = bool(__package__)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=_CACHE_KERNELS)
+    def _clear_person(i, isolated, infection_tier, treatment_tier,
+                      time_infected, time_treated):
+        """Clear the infection, treatment and isolation of a person"""
+        isolated[i] = False
+        infection_tier[i] = NO_INFECTION
+        treatment_tier[i] = NO_TREATMENT
+        time_infected[i] = 0
+        time_treated[i] = 0
+
+    @njit(parallel=True, cache=_CACHE_KERNELS)
+    def _update_people_kernel(alive, immune, isolated, infection_tier,
+                              treatment_tier, time_infected, time_treated,
+                              active, draws, general_recovery_probabilities,
+                              mutation_probabilities, death_probabilities,
+                              treatment_recovery_probabilities,
+                              spread_probabilities, spreading,
+                              num_resistances, move_up_lag_time,
+                              probability_move_up, isolation_threshold,
+                              product_in_use, probability_product_detect,
+                              product_detection_level):
+        """Apply the state changes of a timestep, other than spread, to each
+        active person in the population, using their row of random draws.
+        Whether each of them then spreads their infection is decided in the
+        same pass, and written into `spreading`"""
+        for k in prange(len(active)):
+            i = active[k]
+            spreading[k] = False
+
+            # Handle increasing treatment
+            if treatment_tier[i] == NO_TREATMENT:
+                treatment_tier[i] = 0
+                time_treated[i] = 0
+            elif (time_treated[i] > move_up_lag_time
+                    and draws[k, DRAW_MOVE_UP] < probability_move_up
+                    and treatment_tier[i] < num_resistances - 1):
+                treatment_tier[i] += 1
+
+            # Handle isolation
+            if treatment_tier[i] >= isolation_threshold:
+                isolated[i] = True
+
+            # Handle use of the product
+            if (product_in_use
+                    and infection_tier[i] >= product_detection_level
+                    and draws[k, DRAW_PRODUCT_DETECT] < probability_product_detect):
+                isolated[i] = True
+                if treatment_tier[i] <= product_detection_level:
+                    treatment_tier[i] = product_detection_level + 1
+                    time_treated[i] = 0
+
+            # Handle recovery generally or by treatment
+            general_recovery = (draws[k, DRAW_GENERAL_RECOVERY]
+                < general_recovery_probabilities[infection_tier[i] + 1])
+            treatment_recovery = (draws[k, DRAW_TREATMENT_RECOVERY]
+                < treatment_recovery_probabilities[
+                    treatment_tier[i], infection_tier[i] + 1])
+            if general_recovery or treatment_recovery:
+                immune[i] = True
+                _clear_person(i, isolated, infection_tier, treatment_tier,
+                              time_infected, time_treated)
+                continue
+
+            # Handle mutation to higher resistance due to treatment
+            if (draws[k, DRAW_MUTATION]
+                    < mutation_probabilities[infection_tier[i] + 1]):
+                infection_tier[i] = treatment_tier[i]
+
+            # Handle deaths due to infection
+            if (draws[k, DRAW_DEATH]
+                    < death_probabilities[infection_tier[i] + 1, time_infected[i]]):
+                alive[i] = False
+                immune[i] = False
+                _clear_person(i, isolated, infection_tier, treatment_tier,
+                              time_infected, time_treated)
+                continue
+
+            # Handle agent state about timesteps
+            time_infected[i] += 1
+            time_treated[i] += 1
+
+            # Decide whether they spread, as they are still infected, unless
+            # they are isolated
+            spreading[k] = (not isolated[i]
+                and draws[k, DRAW_SPREAD]
+                    < spread_probabilities[infection_tier[i] + 1])
+
+
+class ModelState:
+    ARRAY_NAMES = [
+        "alive", "immune", "isolated", "infection_tier", "treatment_tier",
+        "time_infected", "time_treated",
+    ]
+
+    def __init__(self, population_size, batch_size=1):
+        """Initialise the state of a batch of independent replicates of a
+        population of uninfected people, stored as a structure of arrays with
+        a row for each replicate and an element for each person"""
+        shape = (batch_size, population_size)
+        self.alive = np.ones(shape, dtype=bool)
+        self.immune = np.zeros(shape, dtype=bool)
+        self.isolated = np.zeros(shape, dtype=bool)
+        self.infection_tier = np.full(shape, NO_INFECTION, dtype=np.int8)
+        self.treatment_tier = np.full(shape, NO_TREATMENT, dtype=np.int8)
+        self.time_infected = np.zeros(shape, dtype=np.int32)
+        self.time_treated = np.zeros(shape, dtype=np.int32)
+
+    @staticmethod
+    def from_population(population, batch_size=1):
+        """Make the state of a population given as a list of people, with
+        every replicate in the batch starting from it"""
+        state = ModelState(len(population), batch_size)
+        for i, person in enumerate(population):
+            state.set_person(i, person)
+        return state
+
+    @property
+    def shape(self):
+        """Return the shape of the arrays, as (batch size, population size)"""
+        return tuple(self.alive.shape)
+
+    def to_torch(self, device):
+        """Move all the arrays onto a device as PyTorch tensors"""
+        for name in ModelState.ARRAY_NAMES:
+            setattr(self, name, torch.from_numpy(getattr(self, name)).to(device))
+
+    def take(self, indices):
+        """Return a copy of the state of the people at indices of the batch
+        flattened into one long population, as a single replicate"""
+        state = ModelState(0)
+        for name in ModelState.ARRAY_NAMES:
+            setattr(state, name, getattr(self, name).ravel()[indices][None])
+        return state
+
+    def put(self, indices, state):
+        """Write a state taken with `take` back to the people at indices of
+        the flattened batch"""
+        for name in ModelState.ARRAY_NAMES:
+            getattr(self, name).ravel()[indices] = getattr(state, name)[0]
+
+    def count_categories(self):
+        """Return the number of people in each category recorded by the data
+        handler for every replicate, as an array with a row for each: the
+        infected people by tier, then dead, immune, uninfected and isolated
+        people. This works the same whether the state is held as NumPy arrays
+        or PyTorch tensors"""
+        # Give everyone the code of their category, other than isolation,
+        # which overlaps the others, in the order the counts are returned
+        num_tiers = Params.NUM_RESISTANCES + 1
+        num_categories = num_tiers + 3
+        codes = self.infection_tier + 1
+        codes[self.infection_tier == NO_INFECTION] = num_tiers + 2
+        codes[~self.alive] = num_tiers
+        codes[self.immune] = num_tiers + 1
+
+        # Offset the codes of each replicate, so the whole batch can be
+        # counted with one bincount
+        batch_size = self.alive.shape[0]
+        if isinstance(self.alive, np.ndarray):
+            offsets = np.arange(batch_size)[:, None] * num_categories
+            counts = np.bincount((codes + offsets).ravel(),
+                                 minlength=batch_size * num_categories)
+            isolated = self.isolated.sum(1)
+        else:
+            offsets = torch.arange(batch_size, device=codes.device)[:, None] * num_categories
+            counts = torch.bincount((codes.long() + offsets).ravel(),
+                                    minlength=batch_size * num_categories).cpu().numpy()
+            isolated = self.isolated.sum(1).cpu().numpy()
+        return np.column_stack([counts.reshape(batch_size, num_categories), isolated])
+
+    def set_person(self, i, person):
+        """Set the state of the person at an index in every replicate from a
+        person object"""
+        self.alive[:, i] = person.alive
+        self.immune[:, i] = person.immune
+        self.isolated[:, i] = person.isolated
+        self.time_infected[:, i] = person.time_infected
+        if person.infection is not None:
+            self.infection_tier[:, i] = person.infection.tier
+        else:
+            self.infection_tier[:, i] = NO_INFECTION
+        if person.treatment is not None:
+            self.treatment_tier[:, i] = person.treatment.tier
+            self.time_treated[:, i] = person.treatment.time_treated
+        else:
+            self.treatment_tier[:, i] = NO_TREATMENT
+            self.time_treated[:, i] = 0
+
+    def get_person(self, i, replicate=0):
+        """Return a person object with the state of the person at an index in
+        a replicate"""
+        infection_tier = self.infection_tier[replicate, i]
+        treatment_tier = self.treatment_tier[replicate, i]
+        infection, treatment = None, None
+        if infection_tier != NO_INFECTION:
+            if infection_tier == -1:
+                infection = Infection()
+            else:
+                infection = Infection(Params.DRUG_NAMES[infection_tier])
+        if treatment_tier != NO_TREATMENT:
+            treatment = Treatment(
+                Params.DRUG_NAMES[treatment_tier],
+                int(self.time_treated[replicate, i])
+            )
+        return Person(
+            infection,
+            treatment,
+            bool(self.isolated[replicate, i]),
+            bool(self.immune[replicate, i]),
+            int(self.time_infected[replicate, i]),
+            bool(self.alive[replicate, i]),
+        )
+
+    def recover_from_infection(self, mask):
+        """Recover the people selected by the mask, returning them to their
+        default state, but now immune to the infection"""
+        self.immune[mask] = True
+        self._reset(mask)
+
+    def die(self, mask):
+        """Make the people selected by the mask no longer alive"""
+        self.alive[mask] = False
+        self.immune[mask] = False
+        self._reset(mask)
+
+    def _reset(self, mask):
+        """Clear the infection, treatment and isolation of the people selected
+        by the mask"""
+        self.isolated[mask] = False
+        self.infection_tier[mask] = NO_INFECTION
+        self.treatment_tier[mask] = NO_TREATMENT
+        self.time_infected[mask] = 0
+        self.time_treated[mask] = 0
+
+    def __len__(self):
+        """Return the number of people in the population of each replicate"""
+        return self.alive.shape[1]
+
+
 class Model:
-    def __init__(self, population=None):
-        """Initialise the model as having a population of people"""
+    def __init__(self, population=None, random_seed=None, batch_size=1):
+        """Initialise the model as having a population of people, given as a
+        list of people or made by default with a set number of them initially
+        infected. A batch of independent replicates of the population can be
+        simulated at once, each starting from the same state"""
         if population is None:
             # Make a default population as having a set number of initially
             # infected people
             num_intially_uninfected = Params.POPULATION_SIZE - Params.INITIALLY_INFECTED
-            population = [Person() for _ in range(num_intially_uninfected)]
-            for _ in range(Params.INITIALLY_INFECTED):
-                population.append(Person(infection=Infection()))
-        self.population = population
+            self.state = ModelState(Params.POPULATION_SIZE, batch_size)
+            self.state.infection_tier[:, num_intially_uninfected:] = -1
+        else:
+            self.state = ModelState.from_population(population, batch_size)
+
+        # All the randomness in the model is drawn from this generator, in
+        # blocks covering the whole batch
+        self.rng = np.random.default_rng(random_seed)
+
+        # Look up the properties of infections by their tier plus one, so the
+        # infection with no resistances comes first
+        self.general_recovery_probabilities = Params.TIER_PROBABILITY_GENERAL_RECOVERY
+        self.mutation_probabilities = Params.TIER_PROBABILITY_MUTATION
+        self.spread_probabilities = Params.TIER_PROBABILITY_SPREAD
+        self.nums_spread_to = Params.TIER_NUM_SPREAD_TO
+        # The death functions only depend on the tier and how long the person
+        # has been infected, which can't be longer than the run, so they can
+        # be evaluated up front
+        max_time_infected = Params.NUM_TIMESTEPS + int(self.state.time_infected.max(initial=0))
+        self.death_probabilities = np.array([
+            Model._evaluate_death_function(death_function, probability, max_time_infected)
+            for death_function, probability in zip(
+                Params.TIER_DEATH_FUNCTION, Params.TIER_PROBABILITY_DEATH)
+        ], dtype=np.float32)
+        # Treatments can only cure infections they work on, so look up their
+        # probability of doing so by both tiers, as zero where they don't
+        self.treatment_recovery_probabilities = np.where(
+            Params.TREATS, Params.TIER_PROBABILITY_TREATMENT_RECOVERY[:, None], 0
+        ).astype(np.float32)
+
+        # Run on a PyTorch device, moving the state and lookup tables onto it
+        self.use_torch = Settings.USE_TORCH and _import_torch()
+        if self.use_torch:
+            self._move_to_torch(Settings.TORCH_DEVICE, random_seed)
+
+        # All the random draws for a timestep are filled into this buffer in
+        # one call, rather than one call for each rule
+        if not self.use_torch:
+            self._draws = np.empty((self.state.alive.size, NUM_DRAWS),
+                                   dtype=np.float32)
+            # The kernel decides who spreads while updating them, into this
+            self._spreading = np.empty(self.state.alive.size, dtype=bool)
 
         # Abstract away all the data handling into another class to avoid
-        # cluttering up the model logic
-        self.data_handler = DataHandler()
+        # cluttering up the model logic, with one for each replicate. Only
+        # the first reports its progress, as the rest would just repeat it
+        self.data_handlers = [
+            DataHandler(report=(replicate == 0)) for replicate in range(batch_size)
+        ]
+        self.data_handler = self.data_handlers[0]
+
+    @staticmethod
+    def _evaluate_death_function(death_function, probability, max_time_infected):
+        """Return the probabilities given by a death function for every time
+        infected up to a maximum. It is given all the times at once if it can
+        take them, where one which doesn't depend on the time may give a
+        single value, and is otherwise given each time in turn"""
+        times = np.arange(max_time_infected + 1)
+        try:
+            return np.broadcast_to(death_function(probability, times), times.shape)
+        except (TypeError, ValueError):
+            return [death_function(probability, t) for t in range(max_time_infected + 1)]
+
+    def _move_to_torch(self, device, random_seed):
+        """Move the state and lookup tables of the model onto a device as
+        PyTorch tensors, drawing random numbers with a generator there"""
+        self.torch_device = device
+        self.state.to_torch(device)
+        # Random draws are single precision, so the probabilities are too
+        for name in [
+                "general_recovery_probabilities", "mutation_probabilities",
+                "spread_probabilities", "death_probabilities",
+                "treatment_recovery_probabilities"]:
+            setattr(self, name, torch.as_tensor(
+                getattr(self, name), dtype=torch.float32, device=device))
+        self.max_spread_to = int(self.nums_spread_to.max())
+        self.nums_spread_to = torch.as_tensor(self.nums_spread_to, device=device)
+        self.torch_generator = torch.Generator(device=device)
+        if random_seed is not None:
+            self.torch_generator.manual_seed(random_seed)
+        else:
+            self.torch_generator.seed()
+
+    @property
+    def population(self):
+        """Return the population of the model, from the first replicate if it
+        is run as a batch, as a list of people"""
+        return [self.state.get_person(i) for i in range(len(self.state))]
 
     def run(self):
         """Simulate a number of timesteps within the model"""
@@ -314,114 +778,318 @@ class Model:
         # Repeat the simulation for a set number of timesteps
         for _ in range(Params.NUM_TIMESTEPS):
 
-            # For each person in the population
-            for person in self.population:
-
-                # Record the data throughout the model
-                self.data_handler.record_person(person)
-
-                # If the person is dead, they will not change state
-                if not person.alive:
-                    continue
-
-                # If the person is infected, apply appropriate state changes
-                if person.infection is not None:
-
-                    """Handle increasing treatment"""
-                    if person.treatment is None:
-                        # If the person is infected but are not being treated
-                        # with **anything**, start them on the lowest tier
-                        # treatment (we can know that the person is infected,
-                        # but not which tier they are on, without diagnostic
-                        # tools, as we can see they are sick)
-                        person.treatment = Treatment()
-                    else:
-                        # If the person has been treated for a number of
-                        # consecutive days with the, a certain probability is
-                        # exceeded, move them up a treatment tier
-                        time_cond = person.treatment.time_treated > Params.TIMESTEPS_MOVE_UP_LAG_TIME
-                        rand_cond = decision(Params.PROBABILITY_MOVE_UP_TREATMENT)
-                        if time_cond and rand_cond:
-                            person.increase_treatment()
-
-                    """Handle isolation"""
-                    # Isolate if in high enough treatment class (which
-                    # is not the same as infection class - this will
-                    # likely lag behind)
-                    treatment_tier = Infection.get_tier_from_resistance(person.treatment.drug)
-                    if treatment_tier >= Params.ISOLATION_THRESHOLD:
-                        person.isolate()
-
-                    """Handle use of the product"""
-                    if person.infection.get_tier() >= Params.PRODUCT_DETECTION_LEVEL:
-                        if Params.PRODUCT_IN_USE and decision(Params.PROBABILIY_PRODUCT_DETECT):
-                            # Put people into isolation if our product detects
-                            # them as being infected
-                            person.isolate()
-
-                            # If a person has the detected infection, put them on
-                            # a treatment course for it, (i.e. only ever change
-                            # it up to one above)
-                            if Params.DRUG_NAMES.index(person.treatment.drug) <= Params.PRODUCT_DETECTION_LEVEL:
-                                person.treatment = Treatment(Params.DRUG_NAMES[Params.PRODUCT_DETECTION_LEVEL+1])
-
-                    """Handle Recovery generally or by treatment if currently infected"""
-                    general_recovery = decision(person.infection.general_recovery_probability)
-                    treatment_recovery = (person.correct_treatment() and
-                                          decision(person.treatment.treatment_recovery_probability))
-                    if general_recovery or treatment_recovery:
-                        person.recover_from_infection()
-                        # Don't do anything else, as infection/treatment will
-                        # now be set to None
-                        continue
-
-                    """Handle Mutation to higher resistance due to treatment"""
-                    if decision(person.infection.mutation_probability):
-                        person.mutate_infection()
-
-                    """Handle deaths due to infection"""
-                    death_probability = person.infection.death_function(
-                        person.infection.death_probability,
-                        person.time_infected
-                    )
-                    if decision(death_probability):
-                        person.die()
-                        # Don't do anything else, as infection/treatment will
-                        # now be set to None
-                        continue
-
-                    """Handle agent state about timesteps"""
-                    # Increment the of timesteps a person has had the infection
-                    person.time_infected += 1
-                    # Increment the number of timesteps a person has been
-                    # treated with the drug (treatment will always not be
-                    # None by this point)
-                    person.treatment.time_treated += 1
-
-            """Handle infection spread through the population"""
-            # We need a deepcopy operation, to prevent someone who has just
-            # been spread to in this timestep spreading the thing they've
-            # just received, so technically don't have yet
-            updated_population = [p.duplicate() for p in self.population]
-            for person in self.population:
-                # `updated_population` is passed by reference, since it is
-                # a list, so we can mutate it's state in different functions
-                # and don't need to pass it back
-                person.try_spread_infection(updated_population)
-            self.population = updated_population[:]
-
-            # updated_population data recorded in this timestep, and output any according
-            # to parameters indicating output format
-            self.data_handler.process_timestep_data()
+            # Record the data throughout the model
+            counts = self.state.count_categories()
+            for data_handler, replicate_counts in zip(self.data_handlers, counts):
+                data_handler.record_counts(replicate_counts)
+
+            # Once no one in any replicate is infected, nothing can change, so
+            # the data of the remaining timesteps is the same as this one
+            if not counts[:, :Params.NUM_RESISTANCES + 1].any():
+                for data_handler in self.data_handlers:
+                    data_handler.fill_remaining_timesteps()
+                break
+
+            # Apply the state changes to everyone in the population at once
+            self.step()
+
+            # Data recorded in this timestep, and output any according to
+            # parameters indicating output format
+            for data_handler in self.data_handlers:
+                data_handler.process_timestep_data()
+
+    def step(self):
+        """Apply the state changes of one timestep to the whole population"""
+        if self.use_torch:
+            self.update_people_torch()
+            self.spread_infections_torch()
+            return
+
+        # If the person is dead or uninfected, they will not change state or
+        # spread, so only the infected people alive are active, and random
+        # numbers are only drawn for them, with a row each in order of their
+        # indices in the flattened batch
+        state = self.state
+        active = np.flatnonzero(
+            state.alive.ravel() & (state.infection_tier.ravel() != NO_INFECTION))
+        draws = self._draws[:active.size]
+        self.rng.random(out=draws, dtype=np.float32)
+
+        spreading = None
+        if NUMBA_AVAILABLE and Settings.USE_NUMBA:
+            spreading = self.update_people_kernel(active, draws)
+        else:
+            self.update_people(active, draws)
+
+        """Handle infection spread through the population"""
+        self.spread_infections(active, draws, spreading)
+
+    def update_people_kernel(self, active, draws):
+        """Apply the state changes of one timestep, other than spread, to the
+        active people with the compiled kernel, returning whether each of
+        them spreads their infection"""
+        state = self.state
+        spreading = self._spreading[:active.size]
+        # Every person is updated independently, so the kernel can treat the
+        # whole batch as one long population, through flattened views
+        _update_people_kernel(
+            state.alive.ravel(), state.immune.ravel(), state.isolated.ravel(),
+            state.infection_tier.ravel(), state.treatment_tier.ravel(),
+            state.time_infected.ravel(), state.time_treated.ravel(),
+            active, draws, self.general_recovery_probabilities,
+            self.mutation_probabilities, self.death_probabilities,
+            self.treatment_recovery_probabilities,
+            self.spread_probabilities, spreading,
+            Params.NUM_RESISTANCES, Params.TIMESTEPS_MOVE_UP_LAG_TIME,
+            float(Params.PROBABILITY_MOVE_UP_TREATMENT),
+            Params.ISOLATION_THRESHOLD, bool(Params.PRODUCT_IN_USE),
+            float(Params.PROBABILIY_PRODUCT_DETECT),
+            Params.PRODUCT_DETECTION_LEVEL,
+        )
+        return spreading
+
+    def update_people(self, active, draws):
+        """Apply the state changes of one timestep, other than spread, to the
+        active people, as a masked array operation for each rule"""
+        # Work on a copy of just the active people, written back at the end
+        state = self.state.take(active)
+        draws = draws[None]
+
+        # If the person is dead, they will not change state, so only the
+        # infected people alive will
+        infected = state.alive & (state.infection_tier != NO_INFECTION)
+
+        """Handle increasing treatment"""
+        # If the person is infected but are not being treated with
+        # **anything**, start them on the lowest tier treatment (we can know
+        # that the person is infected, but not which tier they are on,
+        # without diagnostic tools, as we can see they are sick)
+        untreated = infected & (state.treatment_tier == NO_TREATMENT)
+        state.treatment_tier[untreated] = 0
+        state.time_treated[untreated] = 0
+        # If the person has been treated for a number of consecutive days
+        # with the, a certain probability is exceeded, move them up a
+        # treatment tier
+        time_cond = state.time_treated > Params.TIMESTEPS_MOVE_UP_LAG_TIME
+        rand_cond = draws[..., DRAW_MOVE_UP] < Params.PROBABILITY_MOVE_UP_TREATMENT
+        can_increase = state.treatment_tier < Params.NUM_RESISTANCES - 1
+        state.treatment_tier += infected & ~untreated & time_cond & rand_cond & can_increase
+
+        """Handle isolation"""
+        # Isolate if in high enough treatment class (which is not the same as
+        # infection class - this will likely lag behind)
+        state.isolated |= infected & (state.treatment_tier >= Params.ISOLATION_THRESHOLD)
+
+        """Handle use of the product"""
+        if Params.PRODUCT_IN_USE:
+            detected = (infected
+                & (state.infection_tier >= Params.PRODUCT_DETECTION_LEVEL)
+                & (draws[..., DRAW_PRODUCT_DETECT] < Params.PROBABILIY_PRODUCT_DETECT))
+            # Put people into isolation if our product detects them as being
+            # infected
+            state.isolated |= detected
+
+            # If a person has the detected infection, put them on a treatment
+            # course for it, (i.e. only ever change it up to one above)
+            retreated = detected & (state.treatment_tier <= Params.PRODUCT_DETECTION_LEVEL)
+            state.treatment_tier[retreated] = Params.PRODUCT_DETECTION_LEVEL + 1
+            state.time_treated[retreated] = 0
+
+        # The tiers of uninfected people index the ends of the lookup tables,
+        # but they are masked out by `infected` wherever it matters
+        infection_index = state.infection_tier + 1
+
+        """Handle Recovery generally or by treatment if currently infected"""
+        general_recovery = (draws[..., DRAW_GENERAL_RECOVERY]
+            < self.general_recovery_probabilities[infection_index])
+        # The treatment only works if the infection isn't resistant to its
+        # drug, which is built into the lookup table
+        treatment_recovery = (draws[..., DRAW_TREATMENT_RECOVERY]
+            < self.treatment_recovery_probabilities[state.treatment_tier, infection_index])
+        recovered = infected & (general_recovery | treatment_recovery)
+        state.recover_from_infection(recovered)
+        # Don't do anything else to them, as infection/treatment are now unset
+        infected &= ~recovered
+
+        """Handle Mutation to higher resistance due to treatment"""
+        mutated = infected & (draws[..., DRAW_MUTATION]
+            < self.mutation_probabilities[infection_index])
+        state.infection_tier[mutated] = state.treatment_tier[mutated]
+
+        """Handle deaths due to infection"""
+        death_probability = self.death_probabilities[
+            state.infection_tier + 1, state.time_infected]
+        died = infected & (draws[..., DRAW_DEATH] < death_probability)
+        state.die(died)
+        infected &= ~died
+
+        """Handle agent state about timesteps"""
+        # Increment the of timesteps a person has had the infection, and been
+        # treated with the drug (treatment will always be set by this point)
+        state.time_infected[infected] += 1
+        state.time_treated[infected] += 1
+
+        self.state.put(active, state)
+
+    def spread_infections(self, active, draws, spreading=None):
+        """Give the infection of each spreading person to other people, as
+        long as they can receive it (susceptible), don't already have a more
+        resistant infection (directional), and neither are isolated
+        (contactable). Only the active people can spread, and which of them
+        do may be given, if it has already been decided"""
+        state = self.state
+        population_size = len(state)
+        # Work on the batch flattened into one long population, indexing each
+        # replicate's people from a multiple of the population size. Only the
+        # people involved are looked up, so this doesn't scale with the size
+        # of the population
+        infection_tier = state.infection_tier.ravel()
+        alive, immune, isolated = (
+            state.alive.ravel(), state.immune.ravel(), state.isolated.ravel())
+
+        # Isolated people can't spread to anyone, so aren't drawn for, and
+        # neither can active people who have just recovered or died
+        if spreading is None:
+            active_tiers = infection_tier[active]
+            spreading = ((active_tiers != NO_INFECTION) & ~isolated[active]
+                & (draws[:, DRAW_SPREAD]
+                   < self.spread_probabilities[active_tiers + 1]))
+        spreaders = active[spreading]
+
+        # Draw every receiver at once, each spreader having a number of them
+        # set by their tier, from the same replicate as them. These are drawn
+        # with replacement, so a spreader may pick the same person twice,
+        # which has no effect
+        spreader_tiers = infection_tier[spreaders]
+        nums_spread_to = self.nums_spread_to[spreader_tiers + 1]
+        spreader_tiers = np.repeat(spreader_tiers, nums_spread_to)
+        replicate_starts = np.repeat(
+            spreaders - spreaders % population_size, nums_spread_to)
+        receivers = replicate_starts + self.rng.integers(
+            0, population_size, size=spreader_tiers.size)
+        receiving = (alive[receivers] & ~immune[receivers] & ~isolated[receivers]
+            & (infection_tier[receivers] < spreader_tiers))
+
+        # The spreaders were all found from the tiers before any spread, so
+        # someone who has just been spread to in this timestep can't spread
+        # the thing they've just received, and the spread can be written
+        # straight into the state without a separate buffer.
+        # When several people spread to the same person, they end up with the
+        # most resistant of the infections, whatever order they happen in
+        np.maximum.at(infection_tier, receivers[receiving],
+                      spreader_tiers[receiving])
+
+    def _draw_torch(self, shape):
+        """Draw uniform random numbers in [0, 1) on the PyTorch device"""
+        return torch.rand(shape, generator=self.torch_generator,
+                          device=self.torch_device)
+
+    def update_people_torch(self):
+        """Apply the state changes of one timestep, other than spread, to the
+        whole population, as the same masked operations as `update_people`
+        on PyTorch tensors"""
+        state = self.state
+        shape = state.shape
+        infected = state.alive & (state.infection_tier != NO_INFECTION)
+
+        """Handle increasing treatment"""
+        untreated = infected & (state.treatment_tier == NO_TREATMENT)
+        state.treatment_tier[untreated] = 0
+        state.time_treated[untreated] = 0
+        state.treatment_tier += (infected & ~untreated
+            & (state.time_treated > Params.TIMESTEPS_MOVE_UP_LAG_TIME)
+            & (self._draw_torch(shape) < Params.PROBABILITY_MOVE_UP_TREATMENT)
+            & (state.treatment_tier < Params.NUM_RESISTANCES - 1))
+
+        """Handle isolation"""
+        state.isolated |= infected & (state.treatment_tier >= Params.ISOLATION_THRESHOLD)
+
+        """Handle use of the product"""
+        if Params.PRODUCT_IN_USE:
+            detected = (infected
+                & (state.infection_tier >= Params.PRODUCT_DETECTION_LEVEL)
+                & (self._draw_torch(shape) < Params.PROBABILIY_PRODUCT_DETECT))
+            state.isolated |= detected
+            retreated = detected & (state.treatment_tier <= Params.PRODUCT_DETECTION_LEVEL)
+            state.treatment_tier[retreated] = Params.PRODUCT_DETECTION_LEVEL + 1
+            state.time_treated[retreated] = 0
+
+        # Tensors can only be indexed by wider integer types than the tiers
+        infection_index = state.infection_tier.long() + 1
+        treatment_index = state.treatment_tier.long()
+
+        """Handle Recovery generally or by treatment if currently infected"""
+        general_recovery = (self._draw_torch(shape)
+            < self.general_recovery_probabilities[infection_index])
+        treatment_recovery = (self._draw_torch(shape)
+            < self.treatment_recovery_probabilities[treatment_index, infection_index])
+        recovered = infected & (general_recovery | treatment_recovery)
+        state.recover_from_infection(recovered)
+        infected &= ~recovered
+
+        """Handle Mutation to higher resistance due to treatment"""
+        mutated = infected & (self._draw_torch(shape)
+            < self.mutation_probabilities[infection_index])
+        state.infection_tier[mutated] = state.treatment_tier[mutated]
+
+        """Handle deaths due to infection"""
+        death_probability = self.death_probabilities[
+            state.infection_tier.long() + 1, state.time_infected.long()]
+        died = infected & (self._draw_torch(shape) < death_probability)
+        state.die(died)
+        infected &= ~died
+
+        """Handle agent state about timesteps"""
+        state.time_infected[infected] += 1
+        state.time_treated[infected] += 1
+
+    def spread_infections_torch(self):
+        """Spread infections as in `spread_infections`, on PyTorch tensors.
+        To keep the shapes fixed, every person draws as many receivers as the
+        most any tier spreads to, and those they don't use are masked out"""
+        state = self.state
+        batch_size, population_size = state.shape
+        infection_tier = state.infection_tier.long()
+        infected = state.infection_tier != NO_INFECTION
+        contactable = ~state.isolated
+        receivable = state.alive & ~state.immune & contactable
+
+        spreading = infected & contactable & (self._draw_torch(state.shape)
+            < self.spread_probabilities[infection_tier + 1])
+
+        # Draw receivers from each person's own replicate, indexing along the
+        # rows of the batch
+        receivers = torch.randint(
+            0, population_size, (batch_size, population_size * self.max_spread_to),
+            generator=self.torch_generator, device=self.torch_device)
+        spreader_tiers = infection_tier.repeat_interleave(self.max_spread_to, dim=1)
+        spreader_index = torch.arange(
+            self.max_spread_to, device=self.torch_device).repeat(population_size)
+        receiving = (spreading.repeat_interleave(self.max_spread_to, dim=1)
+            & (spreader_index < self.nums_spread_to[spreader_tiers + 1])
+            & torch.gather(receivable, 1, receivers)
+            & (torch.gather(infection_tier, 1, receivers) < spreader_tiers))
+
+        # Receivers who don't get the infection are given no infection, which
+        # leaves them unchanged when taking the most resistant infection
+        state.infection_tier.scatter_reduce_(
+            1, receivers,
+            torch.where(receiving, spreader_tiers, NO_INFECTION).to(torch.int8),
+            reduce="amax")
 
     def __repr__(self):
         """Provide a string representation for the model"""
         return "Model"
 
 
+# Random decisions made outside of the model are drawn from this generator,
+# which is reseeded by `run`
+_rng = np.random.default_rng()
+
+
 def decision(probability):
     """Get a boolean value with a given probability"""
-    return random() < probability
+    return _rng.random() < probability
 
 
 ###############################################
@@ -429,12 +1097,15 @@ def decision(probability):
 ###############################################
 
 class DataHandler:
-    def __init__(self):
+    def __init__(self, report=True):
         """Initialise the data handler for the model as storing data
-        in an appropriate structure"""
-        self.time = []
+        in an appropriate structure, and whether it reports on it"""
+        self.report = report
+        # The data is written into arrays sized for the whole run, with a
+        # column for each timestep
+        self.time = np.zeros(Params.NUM_TIMESTEPS, dtype=np.int32)
         # [infected, resistance #1,.. , resistance #2, dead, immune, uninfected]
-        self.ys_data = [[] for _ in range(4 + Params.NUM_RESISTANCES)]
+        self.ys_data = np.zeros((4 + Params.NUM_RESISTANCES, Params.NUM_TIMESTEPS), dtype=np.int32)
         self.labels = (
             ["Infected"]
             + list(map(lambda x: "Resistance to " + x, Params.DRUG_NAMES))
@@ -442,7 +1113,7 @@ class DataHandler:
         )
 
         # Include isolations separately as they are a non-disjoint category
-        self.non_disjoint = [[]]
+        self.non_disjoint = np.zeros((1, Params.NUM_TIMESTEPS), dtype=np.int32)
         self.non_disjoint_labels = ["Isolated"]
 
         self.timestep = -1
@@ -451,23 +1122,23 @@ class DataHandler:
     def get_infected_data(self):
         """Return the data about infections across all timesteps. Indices give
         0=no resistance, 1=resistance level 1, etc."""
-        return self.ys_data[0:Params.NUM_RESISTANCES+1]
+        return self.ys_data[0:Params.NUM_RESISTANCES+1].tolist()
 
     def get_death_data(self):
         """Return the data about deaths across all timesteps"""
-        return self.ys_data[-3]
+        return self.ys_data[-3].tolist()
 
     def get_immune_data(self):
         """Return the data about immune people across all timesteps"""
-        return self.ys_data[-2]
+        return self.ys_data[-2].tolist()
 
     def get_uninfected_data(self):
         """Return the data about uninfected people across all timesteps"""
-        return self.ys_data[-1]
+        return self.ys_data[-1].tolist()
 
     def get_isolated_data(self):
         """Return the data about isolated people across all timesteps"""
-        return self.non_disjoint[0]
+        return self.non_disjoint[0].tolist()
 
     def _new_timestep_vars(self):
         """Make some helper variables"""
@@ -478,33 +1149,23 @@ class DataHandler:
         self.num_isolated = 0
         self.timestep += 1
 
-    def record_person(self, person):
-        """Record data about a person in the helper variables, so a whole
-        statistic can be formed by running this function on every person in
-        the population"""
-        if person.immune:
-            self.num_immune += 1
-        elif not person.alive:
-            self.num_dead += 1
-        elif person.infection is None:
-            self.num_uninfected += 1
-        else:
-            self.num_infected_stages[person.infection.get_tier() + 1] += 1
+    def record_counts(self, counts):
+        """Record the number of people in each category, as given for a
+        replicate by `ModelState.count_categories`, in the helper variables"""
+        counts = [int(count) for count in counts]
+        self.num_infected_stages = counts[:Params.NUM_RESISTANCES + 1]
+        self.num_dead, self.num_immune, self.num_uninfected = counts[-4:-1]
 
         # Non-disjoint categories
-        if person.isolated:
-            self.num_isolated += 1
+        self.num_isolated = counts[-1]
 
     def process_timestep_data(self):
         """Store the current timestep's data into the appropriate data
         structures"""
-        for j, v in enumerate(self.num_infected_stages):
-            self.ys_data[j].append(v)
-        self.ys_data[-3].append(self.num_dead)
-        self.ys_data[-2].append(self.num_immune)
-        self.ys_data[-1].append(self.num_uninfected)
-        self.non_disjoint[0].append(self.num_isolated)
-        self.time.append(self.timestep)
+        t = self.timestep
+        self.ys_data[:, t] = self._current_disjoint_data()
+        self.non_disjoint[0, t] = self.num_isolated
+        self.time[t] = t
 
         # Report the model's state through any mechanism set in parameters
         self._report_model_state()
@@ -512,6 +1173,27 @@ class DataHandler:
         # Reset the helper variables
         self._new_timestep_vars()
 
+    def fill_remaining_timesteps(self):
+        """Store the current timestep's data into it and every timestep after
+        it, for when the model can no longer change state"""
+        t = self.timestep
+        self.ys_data[:, t:] = np.array(self._current_disjoint_data())[:, None]
+        self.non_disjoint[0, t:] = self.num_isolated
+        self.time[t:] = np.arange(t, Params.NUM_TIMESTEPS)
+
+        # Report the model's state at each of the timesteps, as if they had
+        # been run, then leave the data handler at the end of the run so the
+        # filled timesteps can't be written over
+        for timestep in range(t, Params.NUM_TIMESTEPS):
+            self.timestep = timestep
+            self._report_model_state()
+        self.timestep = Params.NUM_TIMESTEPS
+
+    def _current_disjoint_data(self):
+        """Return the current timestep's data for each disjoint category"""
+        return self.num_infected_stages + [
+            self.num_dead, self.num_immune, self.num_uninfected]
+
     def _preprocess_disjoint_labels(self):
         """Preprocess the data and the labelling for some graph types"""
         # When as a line graph, we can draw lines for categories which
@@ -522,13 +1204,12 @@ class DataHandler:
         # Furthemore, categories such as isolated which are just totally
         # disjoint can also be included
         if Settings.GRAPH_TYPE == "line":
-            datas = []
-            for i in range(Params.NUM_RESISTANCES + 1):
-                datas.append(
-                    [sum(x) for x in zip(*self.ys_data[i:-3])]
-                )
-            datas.extend(self.ys_data[-3:])
-            datas.extend(self.non_disjoint)
+            infected = self.ys_data[:Params.NUM_RESISTANCES + 1]
+            datas = np.concatenate([
+                np.cumsum(infected[::-1], axis=0)[::-1],
+                self.ys_data[-3:],
+                self.non_disjoint,
+            ])
             final_labels = self.labels + self.non_disjoint_labels
             return datas, final_labels
         return self.ys_data, self.labels
@@ -555,6 +1236,8 @@ class DataHandler:
 
     def _report_model_state(self):
         """Report the model's state through any mechanism set in parameters"""
+        if not self.report:
+            return
         if Settings.REPORT_MOD_NUM is None or self.timestep % Settings.REPORT_MOD_NUM == 0:
             # Print how far through the model run we are
             if Settings.REPORT_PROGRESS and not Settings.PRINT_DATA:
@@ -632,11 +1315,20 @@ class DataRenderer:
 def run():
     """Run the model with a given set of parameters"""
     # Seed the random number generator
+    global _rng
     if Settings.RANDOM_SEED is not None:
-        seed(Settings.RANDOM_SEED)
+        _rng = np.random.default_rng(Settings.RANDOM_SEED)
 
     # Create and run the model
-    m = Model()
+    m = Model(random_seed=Settings.RANDOM_SEED)
+    m.run()
+    return m
+
+
+def run_batch(batch_size):
+    """Run a batch of independent replicates of the model at once with a given
+    set of parameters, with the data of each in `Model.data_handlers`"""
+    m = Model(random_seed=Settings.RANDOM_SEED, batch_size=batch_size)
     m.run()
     return m
 